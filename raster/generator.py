@@ -15,19 +15,108 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from __future__ import annotations
+
 import os
+import warnings
 
 import numpy as np
 import rasterio
+from numpy.random import PCG64
 from rasterio.transform import from_origin
 
+try:
+    import numba as nb
+except ImportError:  # numba is optional, bands are filled with NumPy without it
+    nb = None
+
+try:
+    from numba import cuda
+    from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float32
+except ImportError:  # the CUDA target is optional, only the cpu backend is available without it
+    cuda = None
+
+
+if nb is not None:
+    _next_uint32 = PCG64().ctypes.next_uint32
+
+    @nb.njit(parallel=True, fastmath=True)
+    def _fill_bands_jit(cube, lows, spans, states):
+        # One thread per band, each drawing from its own PCG64 stream so that
+        # no generator state is shared across threads.
+        for b in nb.prange(cube.shape[0]):
+            state = states[b]
+            for y in range(cube.shape[1]):
+                for x in range(cube.shape[2]):
+                    # Top 24 bits give an exact float32 uniform in [0, 1)
+                    u = np.float32(_next_uint32(state) >> 8) * np.float32(1.0 / 16777216.0)
+                    cube[b, y, x] = lows[b] + spans[b] * u
+
+
+if cuda is not None:
+    @cuda.jit
+    def _fill_bands_cuda_kernel(cube, lows, spans, rng_states):
+        # Grid-stride loop, each thread drawing from its own xoroshiro128+ stream
+        tid = cuda.grid(1)
+        band_size = cube.shape[1] * cube.shape[2]
+        for i in range(tid, cube.shape[0] * band_size, cuda.gridsize(1)):
+            b = i // band_size
+            y = (i % band_size) // cube.shape[2]
+            x = i % cube.shape[2]
+            u = xoroshiro128p_uniform_float32(rng_states, tid)
+            cube[b, y, x] = lows[b] + spans[b] * u
+
+
+def _fill_bands(cube: np.ndarray, lows: np.ndarray, spans: np.ndarray, seed: int | None) -> None:
+    """Fill ``cube`` (bands, height, width) with uniforms in [low, low + span) per band."""
+    if nb is not None:
+        bit_generators = [PCG64(seed).jumped(i) for i in range(cube.shape[0])]
+        states = np.array(
+            [bit_gen.ctypes.state_address for bit_gen in bit_generators], dtype=np.uintp
+        )
+        _fill_bands_jit(cube, lows, spans, states)
+        return
+
+    rng = np.random.default_rng(seed)
+    rng.random(out=cube, dtype=np.float32)
+    np.multiply(cube, spans[:, None, None], out=cube)
+    np.add(cube, lows[:, None, None], out=cube)
+
+
+# Minimum number of samples for which the CUDA backend is used, below this the
+# host-device transfer and kernel launch cost more than they save
+CUDA_MIN_SAMPLES = 1 << 24
+
+# Number of CUDA threads (and xoroshiro128+ streams) filling a cube
+CUDA_BLOCKS = 256
+CUDA_THREADS_PER_BLOCK = 256
+
+
+def _fill_bands_cuda(cube: np.ndarray, lows: np.ndarray, spans: np.ndarray, seed: int | None) -> None:
+    """Fill ``cube`` like _fill_bands, generating the samples on a CUDA device."""
+    if cuda is None or not cuda.is_available():
+        raise RuntimeError("CUDA backend requested but no CUDA device is available")
+
+    n_threads = CUDA_BLOCKS * CUDA_THREADS_PER_BLOCK
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    rng_states = create_xoroshiro128p_states(n_threads, seed=seed)
+    d_cube = cuda.device_array(cube.shape, dtype=np.float32)
+    _fill_bands_cuda_kernel[CUDA_BLOCKS, CUDA_THREADS_PER_BLOCK](
+        d_cube, cuda.to_device(lows), cuda.to_device(spans), rng_states
+    )
+    d_cube.copy_to_host(cube)
+
 
 def create_multiband_landsat_like_cog(
     filename: str,
     width: int = 512,
     height: int = 512,
     res: int = 30,
-    crs: str = "EPSG:4326"
+    crs: str = "EPSG:4326",
+    seed: int | None = None,
+    dtype: str = "float32",
+    backend: str = "cpu"
 ):
     """
     Create a synthetic multi-band Cloud-Optimized GeoTIFF (COG) resembling Landsat data.
@@ -43,20 +132,45 @@ def create_multiband_landsat_like_cog(
     7. SWIR2 (B7)
     8. Thermal IR 1 (B10)
     9. Thermal IR 2 (B11)
+
+    All bands are drawn as float32 uniforms seeded with ``seed`` and scaled
+    to their value ranges. With the default ``backend="cpu"`` they come from
+    PCG64 generators, in a single parallel pass (one PCG64 stream per band)
+    when numba is installed, otherwise with NumPy.
+
+    ``backend="cuda"`` draws float32 bands on a CUDA device with numba's
+    xoroshiro128+ generators, so the samples differ from the CPU backend for
+    the same seed. It requires numba and a CUDA device. It is only used for
+    float32 cubes of at least CUDA_MIN_SAMPLES samples, smaller cubes and
+    ``dtype="uint16"`` are generated on the CPU with a warning.
+
+    With ``dtype="uint16"`` the bands are drawn directly as quantized integers
+    using the Landsat storage encodings (reflectance * 10000, Collection 2
+    surface temperature scale/offset for thermal bands), which halves memory
+    and output size. The scale and offset are recorded on each band.
     """
 
-    # Simulate realistic value ranges for each band
+    # Simulate realistic value ranges for each band, with the scale and offset
+    # used to store them as uint16
     band_ranges = {
-        "Coastal": (0.05, 0.2),
-        "Blue": (0.05, 0.25),
-        "Green": (0.1, 0.3),
-        "Red": (0.1, 0.4),
-        "NIR": (0.2, 0.6),
-        "SWIR1": (0.15, 0.5),
-        "SWIR2": (0.2, 0.55),
-        "Thermal1": (290, 320),  # Kelvin
-        "Thermal2": (290, 320)
+        "Coastal": (0.05, 0.2, 1e-4, 0.0),
+        "Blue": (0.05, 0.25, 1e-4, 0.0),
+        "Green": (0.1, 0.3, 1e-4, 0.0),
+        "Red": (0.1, 0.4, 1e-4, 0.0),
+        "NIR": (0.2, 0.6, 1e-4, 0.0),
+        "SWIR1": (0.15, 0.5, 1e-4, 0.0),
+        "SWIR2": (0.2, 0.55, 1e-4, 0.0),
+        "Thermal1": (290, 320, 0.00341802, 149.0),  # Kelvin
+        "Thermal2": (290, 320, 0.00341802, 149.0)
     }
+    if dtype not in ("float32", "uint16"):
+        raise ValueError(f"Unsupported dtype '{dtype}', expected 'float32' or 'uint16'")
+    if backend not in ("cpu", "cuda"):
+        raise ValueError(f"Unsupported backend '{backend}', expected 'cpu' or 'cuda'")
+
+    lows, highs, scales, offsets = (
+        np.array(values, dtype=np.float64) for values in zip(*band_ranges.values())
+    )
 
     transform = from_origin(100.0, 40.0, res, res)  # top-left corner and pixel size
 
@@ -65,22 +179,52 @@ def create_multiband_landsat_like_cog(
         "height": height,
         "width": width,
         "count": len(band_ranges),
-        "dtype": "float32",
+        "dtype": dtype,
         "crs": crs,
         "transform": transform,
         "tiled": True,
         "blockxsize": 512,
         "blockysize": 512,
-        "compress": "DEFLATE"
+        "compress": "ZSTD",
+        "zstd_level": 1,
+        "predictor": 3 if dtype == "float32" else 2,  # floating point / integer predictor
+        "num_threads": "ALL_CPUS",
+        "interleave": "band"
     }
 
     os.makedirs(os.path.dirname(filename), exist_ok=True)
 
+    shape = (len(band_ranges), height, width)
+    if dtype == "uint16":
+        low_dns = np.round((lows - offsets) / scales).astype(np.uint16)
+        high_dns = np.round((highs - offsets) / scales).astype(np.uint16)
+        rng = np.random.default_rng(seed)
+        cube = rng.integers(
+            low_dns[:, None, None], high_dns[:, None, None], size=shape, dtype=np.uint16
+        )
+    else:
+        cube = np.empty(shape, dtype=np.float32)
+        lows = lows.astype(np.float32)
+        spans = highs.astype(np.float32) - lows
+        if backend == "cuda" and cube.size >= CUDA_MIN_SAMPLES:
+            _fill_bands_cuda(cube, lows, spans, seed)
+        else:
+            _fill_bands(cube, lows, spans, seed)
+
+    if backend == "cuda" and (dtype == "uint16" or cube.size < CUDA_MIN_SAMPLES):
+        warnings.warn(
+            f"CUDA backend requested but the bands were generated on the CPU, it is only used "
+            f"for float32 cubes of at least {CUDA_MIN_SAMPLES} samples",
+            stacklevel=2,
+        )
+
     with rasterio.open(filename, "w", **profile) as dst:
-        for idx, (band_name, (low, high)) in enumerate(band_ranges.items(), start=1):
-            band_data = np.random.uniform(low, high, (height, width)).astype("float32")
-            dst.write(band_data, idx)
+        dst.write(cube)
+        for idx, band_name in enumerate(band_ranges, start=1):
             dst.set_band_description(idx, band_name)
+        if dtype == "uint16":
+            dst.scales = tuple(scales)
+            dst.offsets = tuple(offsets)
 
     print(f"Saved: {filename}")
 
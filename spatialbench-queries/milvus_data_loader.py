@@ -27,35 +27,71 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from queue import Empty, Full, Queue
+from types import MappingProxyType
 from typing import Any
 
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import shapely
 from pymilvus import CollectionSchema, DataType, FieldSchema, MilvusClient
-from shapely import wkb
 
 # Default collection prefix
 DEFAULT_PREFIX = "spatialbench"
 
-# Table definitions with their geometry columns
-TABLE_CONFIGS = {
+# Maximum number of prepared batches waiting to be inserted
+PIPELINE_QUEUE_SIZE = 4
+
+# Format of timestamps stored in VARCHAR fields. Arrow renders sub-second
+# units as fractional seconds in %S.
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Unit of timestamps stored in INT64 fields, as a count since the Unix epoch
+TIMESTAMP_UNIT = "ms"
+
+# Arrow types that values of scalar Milvus fields are cast to before insertion
+ARROW_FIELD_TYPES = {
+    DataType.INT64: pa.int64(),
+    DataType.DOUBLE: pa.float64(),
+    DataType.VARCHAR: pa.string(),
+}
+
+# Table definitions with their geometry columns. Point geometry columns listed
+# in point_coords are also stored as (lon, lat) DOUBLE fields, so queries can
+# read coordinates without parsing WKT.
+TABLE_CONFIGS = MappingProxyType({
     "trip": {
         "geometry_cols": ["t_pickuploc", "t_dropoffloc"],
+        "point_coords": {
+            "t_pickuploc": ("t_pickup_lon", "t_pickup_lat"),
+            "t_dropoffloc": ("t_dropoff_lon", "t_dropoff_lat"),
+        },
         "primary_key": "t_tripkey",
         "schema_fields": [
             ("t_tripkey", DataType.INT64, True),  # primary key
             ("t_custkey", DataType.INT64, False),
             ("t_driverkey", DataType.INT64, False),
             ("t_vehiclekey", DataType.INT64, False),
-            ("t_pickuptime", DataType.VARCHAR, False, 64),
-            ("t_dropofftime", DataType.VARCHAR, False, 64),
+            ("t_pickuptime", DataType.INT64, False),  # epoch milliseconds
+            ("t_dropofftime", DataType.INT64, False),  # epoch milliseconds
             ("t_pickuploc", DataType.GEOMETRY, False),
             ("t_dropoffloc", DataType.GEOMETRY, False),
             ("t_distance", DataType.DOUBLE, False),
             ("t_fare", DataType.DOUBLE, False),
             ("t_tip", DataType.DOUBLE, False),
             ("t_totalamount", DataType.DOUBLE, False),
+            ("t_pickup_lon", DataType.DOUBLE, False),
+            ("t_pickup_lat", DataType.DOUBLE, False),
+            ("t_dropoff_lon", DataType.DOUBLE, False),
+            ("t_dropoff_lat", DataType.DOUBLE, False),
         ],
     },
     "customer": {
@@ -109,51 +145,123 @@ TABLE_CONFIGS = {
             ("z_boundary", DataType.GEOMETRY, False),
         ],
     },
+})
+
+# Per-table Arrow type of every scalar field
+FIELD_ARROW_TYPES = {
+    table_name: {
+        field_def[0]: ARROW_FIELD_TYPES[field_def[1]]
+        for field_def in config["schema_fields"]
+        if field_def[1] in ARROW_FIELD_TYPES
+    }
+    for table_name, config in TABLE_CONFIGS.items()
 }
 
+# Serializes progress output of tables loaded concurrently
+_PRINT_LOCK = threading.Lock()
+
+
+def log(*args: Any, **kwargs: Any) -> None:
+    """Print a progress message without interleaving it with other threads."""
+    with _PRINT_LOCK:
+        print(*args, flush=True, **kwargs)
 
-def wkb_to_wkt(wkb_data: bytes | None) -> str | None:
-    """Convert WKB geometry to WKT format."""
-    if wkb_data is None:
-        return None
-    try:
-        geom = wkb.loads(wkb_data)
-        return geom.wkt
-    except Exception as e:
-        print(f"Warning: Failed to convert WKB to WKT: {e}")
-        return None
+
+def parse_geometries(column: pa.Array) -> np.ndarray:
+    """Parse an Arrow array of WKB (or WKT) geometries.
+
+    Runs as a single vectorized GEOS call over the whole column. Nulls stay
+    null, and invalid geometries are reported with a warning and converted
+    to null.
+    """
+    values = column.to_numpy(zero_copy_only=False)
+    if pa.types.is_binary(column.type) or pa.types.is_large_binary(column.type):
+        return shapely.from_wkb(values, on_invalid="warn")
+    return shapely.from_wkt(values, on_invalid="warn")
+
+
+def point_coordinates(geoms: np.ndarray) -> tuple[pa.Array, pa.Array]:
+    """Longitude and latitude of point geometries.
+
+    Missing, empty and non-point geometries get null coordinates.
+    """
+    lon = np.full(len(geoms), np.nan)
+    lat = np.full(len(geoms), np.nan)
+    points = shapely.get_type_id(geoms) == shapely.GeometryType.POINT
+    points[points] = ~shapely.is_empty(geoms[points])
+    lon[points] = shapely.get_x(geoms[points])
+    lat[points] = shapely.get_y(geoms[points])
+    return pa.array(lon, from_pandas=True), pa.array(lat, from_pandas=True)
 
 
-def get_parquet_path(data_dir: Path, table_name: str) -> Path | None:
-    """Get the path to parquet file(s) for a table.
+def get_parquet_path(data_dir: Path, table_name: str) -> tuple[Path, list[Path]] | None:
+    """Get the path to parquet file(s) for a table and the files under it.
 
     Supports:
     1. Directory format: table_name/*.parquet
     2. Single file format: table_name.parquet
+
+    A table directory is listed once, and the sorted file list is returned
+    so that later stages never list it again.
     """
     table_dir = data_dir / table_name
     if table_dir.is_dir():
-        parquet_files = list(table_dir.glob("*.parquet"))
+        with os.scandir(table_dir) as entries:
+            parquet_files = sorted(
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".parquet") and entry.is_file()
+            )
         if parquet_files:
-            return table_dir
+            return table_dir, parquet_files
     single_file = data_dir / f"{table_name}.parquet"
     if single_file.exists():
-        return single_file
+        return single_file, [single_file]
     return None
 
 
-def load_parquet_data(path: Path) -> pd.DataFrame:
-    """Load data from parquet file(s)."""
-    if path.is_dir():
-        # Read all parquet files in directory
-        parquet_files = sorted(path.glob("*.parquet"))
-        dfs = [pd.read_parquet(f) for f in parquet_files]
-        return pd.concat(dfs, ignore_index=True)
-    return pd.read_parquet(path)
+def open_parquet_dataset(parquet_files: list[Path]) -> ds.Dataset:
+    """Open the parquet file(s) backing a table as a dataset.
 
+    Each file footer is parsed once here and cached on its fragment, so row
+    counts and scans of the dataset do not re-read file metadata.
+    """
+    dataset = ds.dataset(parquet_files, format="parquet")
+    for fragment in dataset.get_fragments():
+        fragment.ensure_complete_metadata()
+    return dataset
+
+
+def schema_columns(dataset: ds.Dataset, table_name: str) -> list[str]:
+    """Columns of the dataset that map to fields of the table's Milvus schema."""
+    names = set(dataset.schema.names)
+    return [
+        field_def[0]
+        for field_def in TABLE_CONFIGS[table_name]["schema_fields"]
+        if field_def[0] in names
+    ]
+
+
+def iter_parquet_batches(
+    dataset: ds.Dataset, batch_size: int, columns: list[str] | None = None
+) -> Iterator[pa.RecordBatch]:
+    """Stream record batches from a parquet dataset.
+
+    Several files are read concurrently on the Arrow thread pool while only
+    a bounded readahead window of batches is kept in memory. Only
+    ``columns`` are decoded when given.
+    """
+    yield from dataset.to_batches(columns=columns, batch_size=batch_size, use_threads=True)
 
-def create_collection_schema(table_name: str) -> CollectionSchema:
-    """Create Milvus collection schema for a table."""
+
+def create_collection_schema(table_name: str, dynamic_fields: bool = False) -> CollectionSchema:
+    """Create Milvus collection schema for a table.
+
+    Dynamic fields are disabled by default: the loader only writes schema
+    fields, and a dynamic schema makes Milvus store a per-row $meta blob.
+    All fields except the primary key are nullable, so missing values are
+    stored as nulls rather than placeholder values.
+    """
     config = TABLE_CONFIGS[table_name]
     fields = []
 
@@ -168,6 +276,7 @@ def create_collection_schema(table_name: str) -> CollectionSchema:
                 name=name,
                 dtype=dtype,
                 is_primary=is_primary,
+                nullable=not is_primary,
                 max_length=max_length,
             )
         elif dtype == DataType.GEOMETRY:
@@ -176,44 +285,164 @@ def create_collection_schema(table_name: str) -> CollectionSchema:
                 name=name,
                 dtype=dtype,
                 is_primary=is_primary,
+                nullable=not is_primary,
             )
         else:
             field = FieldSchema(
                 name=name,
                 dtype=dtype,
                 is_primary=is_primary,
+                nullable=not is_primary,
             )
         fields.append(field)
 
     return CollectionSchema(
         fields=fields,
         description=f"SpatialBench {table_name} table",
-        enable_dynamic_field=True,
+        enable_dynamic_field=dynamic_fields,
     )
 
 
-def prepare_row_data(df: pd.DataFrame, table_name: str) -> list[dict[str, Any]]:
-    """Prepare DataFrame rows for Milvus insertion."""
+# Collection schema of every table, built once at import time
+SCHEMAS = MappingProxyType({
+    table_name: create_collection_schema(table_name) for table_name in TABLE_CONFIGS
+})
+
+
+def prepare_row_data(batch: pa.RecordBatch, table_name: str) -> list[dict[str, Any]]:
+    """Prepare a record batch for Milvus insertion.
+
+    All conversions run on Arrow arrays; Python objects are only created by
+    the final to_pylist() call. Nulls are passed through as None. Converted
+    columns are new arrays, so the input batch is never modified and callers
+    do not need to copy it. Coordinate fields of point geometry columns are
+    appended to the batch.
+    """
     config = TABLE_CONFIGS[table_name]
     geometry_cols = config["geometry_cols"]
+    point_coords = config.get("point_coords", {})
+    field_types = FIELD_ARROW_TYPES[table_name]
+
+    names = list(batch.schema.names)
+    columns = []
+    coordinate_columns = []
+    for name, column in zip(batch.schema.names, batch.columns):
+        is_wkb = pa.types.is_binary(column.type) or pa.types.is_large_binary(column.type)
+        # Convert geometry columns from WKB to WKT. pymilvus only accepts WKT
+        # strings for GEOMETRY fields, so columns that already hold WKT are
+        # passed through untouched unless their coordinates are needed.
+        if name in geometry_cols and (is_wkb or name in point_coords):
+            geoms = parse_geometries(column)
+            if name in point_coords:
+                names.extend(point_coords[name])
+                coordinate_columns.extend(point_coordinates(geoms))
+            if is_wkb:
+                column = pa.array(shapely.to_wkt(geoms, rounding_precision=-1), type=pa.string())
+        # Convert timestamp columns to epoch counts for INT64 fields (by the
+        # cast below) and to strings otherwise
+        elif pa.types.is_timestamp(column.type):
+            if field_types.get(name) == pa.int64():
+                column = pc.cast(column, pa.timestamp(TIMESTAMP_UNIT, column.type.tz), safe=False)
+            else:
+                column = pc.strftime(column, format=TIMESTAMP_FORMAT)
+
+        # Cast to the Milvus field type, e.g. decimal amounts to DOUBLE.
+        # Decimals go through their string form, which rounds correctly.
+        target_type = field_types.get(name)
+        if target_type is not None and column.type != target_type:
+            if pa.types.is_decimal(column.type):
+                column = pc.cast(column, pa.string())
+            column = pc.cast(column, target_type)
+        columns.append(column)
+    columns.extend(coordinate_columns)
+
+    return pa.RecordBatch.from_arrays(columns, names=names).to_pylist()
+
+
+def insert_batches(
+    client: MilvusClient,
+    collection_name: str,
+    table_name: str,
+    batches: Iterator[pa.RecordBatch],
+    total_rows: int,
+    reader_threads: int = 1,
+    insert_threads: int = 1,
+) -> int:
+    """Prepare and insert record batches, overlapping reads with inserts.
 
-    # Convert geometry columns from WKB to WKT
-    for col in geometry_cols:
-        if col in df.columns:
-            df[col] = df[col].apply(wkb_to_wkt)
+    Reader threads pull batches from ``batches`` and convert them to rows,
+    insert threads send the rows to Milvus. The stages are connected by a
+    bounded queue, so at most PIPELINE_QUEUE_SIZE prepared batches are held
+    in memory. The first error raised by any thread stops the pipeline and
+    is re-raised here.
 
-    # Convert timestamp columns to string
-    for col in df.columns:
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            df[col] = df[col].astype(str)
+    Returns the number of rows inserted.
+    """
+    if reader_threads < 1 or insert_threads < 1:
+        raise ValueError(
+            f"reader_threads and insert_threads must be at least 1, "
+            f"got {reader_threads} and {insert_threads}"
+        )
+
+    queue: Queue = Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    done = object()
+    failed = threading.Event()
+    batches_lock = threading.Lock()
+    progress_lock = threading.Lock()
+    total_inserted = 0
+
+    def put(item: Any) -> None:
+        while not failed.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def read() -> None:
+        while not failed.is_set():
+            with batches_lock:
+                batch = next(batches, None)
+            if batch is None:
+                return
+            put(prepare_row_data(batch, table_name))
+
+    def insert() -> None:
+        nonlocal total_inserted
+        while not failed.is_set():
+            try:
+                rows = queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if rows is done:
+                return
+            client.insert(
+                collection_name=collection_name,
+                data=rows,
+            )
+            with progress_lock:
+                total_inserted += len(rows)
+                log(f"    Inserted {total_inserted}/{total_rows} rows", end="\r")
 
-    # Handle NaN values
-    df = df.fillna({
-        col: "" for col in df.select_dtypes(include=["object"]).columns
-    })
-    df = df.fillna(0)
+    def run(stage) -> None:
+        try:
+            stage()
+        except BaseException:
+            failed.set()
+            raise
+
+    with ThreadPoolExecutor(max_workers=reader_threads + insert_threads) as pool:
+        readers = [pool.submit(run, read) for _ in range(reader_threads)]
+        inserters = [pool.submit(run, insert) for _ in range(insert_threads)]
+        for future in readers:
+            future.exception()
+        for _ in inserters:
+            put(done)
+
+    for future in readers + inserters:
+        future.result()
 
-    return df.to_dict("records")
+    return total_inserted
 
 
 def load_table_to_milvus(
@@ -222,6 +451,9 @@ def load_table_to_milvus(
     table_name: str,
     prefix: str,
     batch_size: int = 10000,
+    reader_threads: int = 1,
+    insert_threads: int = 1,
+    dynamic_fields: bool = False,
 ) -> int:
     """Load a single table into Milvus.
 
@@ -230,51 +462,55 @@ def load_table_to_milvus(
     collection_name = f"{prefix}_{table_name}"
 
     # Get data path
-    data_path = get_parquet_path(data_dir, table_name)
-    if data_path is None:
-        print(f"  Warning: No data found for table '{table_name}', skipping")
+    parquet_path = get_parquet_path(data_dir, table_name)
+    if parquet_path is None:
+        log(f"  Warning: No data found for table '{table_name}', skipping")
         return 0
 
-    print(f"  Loading {table_name} from {data_path}...")
+    data_path, parquet_files = parquet_path
+    log(f"  Loading {table_name} from {data_path}...")
 
-    # Load data
-    df = load_parquet_data(data_path)
-    print(f"    Loaded {len(df)} rows")
+    dataset = open_parquet_dataset(parquet_files)
+    total_rows = dataset.count_rows()
+    log(f"    Found {total_rows} rows")
 
     # Drop existing collection if exists
     if client.has_collection(collection_name):
-        print(f"    Dropping existing collection '{collection_name}'")
+        log(f"    Dropping existing collection '{collection_name}'")
         client.drop_collection(collection_name)
 
     # Create collection with schema
     # Note: For simplicity, we use auto_id=False and let Milvus use the schema
     # In practice, you might want to customize this further
-    schema = create_collection_schema(table_name)
+    if dynamic_fields:
+        schema = create_collection_schema(table_name, dynamic_fields=True)
+    else:
+        schema = SCHEMAS[table_name]
     client.create_collection(
         collection_name=collection_name,
         schema=schema,
     )
-    print(f"    Created collection '{collection_name}'")
+    log(f"    Created collection '{collection_name}'")
 
-    # Prepare and insert data in batches
-    rows = prepare_row_data(df.copy(), table_name)
-    total_inserted = 0
-
-    for i in range(0, len(rows), batch_size):
-        batch = rows[i:i + batch_size]
-        client.insert(
-            collection_name=collection_name,
-            data=batch,
-        )
-        total_inserted += len(batch)
-        print(f"    Inserted {total_inserted}/{len(rows)} rows", end="\r")
+    # Stream, prepare and insert data one batch at a time
+    total_inserted = insert_batches(
+        client=client,
+        collection_name=collection_name,
+        table_name=table_name,
+        batches=iter_parquet_batches(
+            dataset, batch_size, columns=schema_columns(dataset, table_name)
+        ),
+        total_rows=total_rows,
+        reader_threads=reader_threads,
+        insert_threads=insert_threads,
+    )
 
-    print(f"    Inserted {total_inserted} rows total")
+    log(f"    Inserted {total_inserted} rows total")
 
     # Create R-Tree index for geometry columns
     config = TABLE_CONFIGS[table_name]
     for geom_col in config["geometry_cols"]:
-        print(f"    Creating R-Tree index on '{geom_col}'...")
+        log(f"    Creating R-Tree index on '{geom_col}'...")
         try:
             index_params = {
                 "index_type": "RTREE",
@@ -286,17 +522,25 @@ def load_table_to_milvus(
                 field_name=geom_col,
                 index_params=index_params,
             )
-            print(f"    Created R-Tree index on '{geom_col}'")
+            log(f"    Created R-Tree index on '{geom_col}'")
         except Exception as e:
-            print(f"    Warning: Failed to create R-Tree index on '{geom_col}': {e}")
+            log(f"    Warning: Failed to create R-Tree index on '{geom_col}': {e}")
 
     # Load collection into memory for queries
     client.load_collection(collection_name)
-    print(f"    Collection '{collection_name}' loaded into memory")
+    log(f"    Collection '{collection_name}' loaded into memory")
 
     return total_inserted
 
 
+def positive_int(value: str) -> int:
+    """Parse a command line option that must be an integer of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Load SpatialBench data into Milvus collections"
@@ -331,6 +575,29 @@ def main():
         default=10000,
         help="Batch size for insertion (default: 10000)",
     )
+    parser.add_argument(
+        "--reader-threads",
+        type=positive_int,
+        default=1,
+        help="Number of threads reading and preparing batches (default: 1)",
+    )
+    parser.add_argument(
+        "--insert-threads",
+        type=positive_int,
+        default=1,
+        help="Number of threads inserting batches into Milvus (default: 1)",
+    )
+    parser.add_argument(
+        "--table-parallelism",
+        type=positive_int,
+        default=1,
+        help="Number of tables loaded concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--dynamic-fields",
+        action="store_true",
+        help="Enable dynamic fields on the created collections",
+    )
 
     args = parser.parse_args()
 
@@ -359,16 +626,24 @@ def main():
     print()
 
     total_rows = 0
-    for table in tables:
-        rows = load_table_to_milvus(
-            client=client,
-            data_dir=data_dir,
-            table_name=table,
-            prefix=args.prefix,
-            batch_size=args.batch_size,
-        )
-        total_rows += rows
-        print()
+    with ThreadPoolExecutor(max_workers=args.table_parallelism) as pool:
+        futures = [
+            pool.submit(
+                load_table_to_milvus,
+                client=client,
+                data_dir=data_dir,
+                table_name=table,
+                prefix=args.prefix,
+                batch_size=args.batch_size,
+                reader_threads=args.reader_threads,
+                insert_threads=args.insert_threads,
+                dynamic_fields=args.dynamic_fields,
+            )
+            for table in tables
+        ]
+        for future in as_completed(futures):
+            total_rows += future.result()
+            log()
 
     print(f"Done! Loaded {total_rows} total rows across {len(tables)} tables")
 
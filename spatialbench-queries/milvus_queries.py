@@ -26,22 +26,75 @@ Note: This module requires data to be loaded into Milvus first using milvus_data
 """
 from __future__ import annotations
 
-from typing import Any
+import atexit
+import functools
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import warnings
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full, Queue
+from typing import Any, NamedTuple
 
 import numpy as np
 import pandas as pd
+import shapely
 from pandas import DataFrame
-from pymilvus import MilvusClient
-from shapely import wkb
-from shapely.geometry import MultiPoint, Point, Polygon
+from pymilvus import MilvusClient, MilvusException
+
+try:
+    import numba as nb
+except ImportError:  # numba is optional, NumPy and shapely fallbacks are used without it
+    nb = None
 
 # Milvus collection names (with configurable prefix)
 COLLECTION_PREFIX = "spatialbench"
 
+# Number of rows fetched per query iterator batch, and batches fetched ahead
+QUERY_BATCH_SIZE = 16384
+PREFETCH_BATCHES = 2
+
+# Oldest Milvus server version that applies order_by_fields to queries, older
+# servers ignore the parameter
+ORDER_BY_MIN_SERVER_VERSION = (3, 0)
+
+# Minimum number of rows per shard of a parallel group aggregation
+PARALLEL_SHARD_ROWS = 1 << 20
+
+# Trip columns read by the full-scan queries, cached together on disk when
+# MILVUS_TRIP_CACHE_DIR is set
+TRIP_CACHE_FIELDS = (
+    "t_pickup_lon", "t_pickup_lat", "t_dropoff_lon", "t_dropoff_lat",
+    "t_pickuptime", "t_dropofftime", "t_totalamount", "t_distance",
+)
+
+# Number of pickups per server-side zone lookup in q4, and lookups run at once
+ZONE_LOOKUP_POINTS = 128
+ZONE_LOOKUP_WORKERS = 8
+
 # Supported queries list
 SUPPORTED_QUERIES = ["q1", "q2", "q3", "q4", "q6", "q8", "q9", "q10", "q11"]
 UNSUPPORTED_QUERIES = ["q5", "q7", "q12"]
 
+# Milvus clients shared by all runners, one per URI
+_CLIENT_CACHE: dict[str, MilvusClient] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _close_clients() -> None:
+    """Close the shared Milvus clients."""
+    with _CLIENT_LOCK:
+        for client in _CLIENT_CACHE.values():
+            client.close()
+        _CLIENT_CACHE.clear()
+
+
+atexit.register(_close_clients)
+
 
 class MilvusQueryRunner:
     """Runner for Milvus GIS queries."""
@@ -52,14 +105,20 @@ class MilvusQueryRunner:
         self.client: MilvusClient | None = None
 
     def connect(self) -> None:
-        """Connect to Milvus server."""
-        self.client = MilvusClient(uri=self.uri)
+        """Connect to Milvus server.
+
+        The client is shared with every runner using the same URI, so the
+        connection is only set up by the first query.
+        """
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(self.uri)
+            if client is None:
+                client = _CLIENT_CACHE[self.uri] = MilvusClient(uri=self.uri)
+        self.client = client
 
     def disconnect(self) -> None:
-        """Disconnect from Milvus server."""
-        if self.client:
-            self.client.close()
-            self.client = None
+        """Release the shared client, which stays open until the process exits."""
+        self.client = None
 
     def _collection_name(self, table: str) -> str:
         """Get full collection name with prefix."""
@@ -74,6 +133,82 @@ class MilvusQueryRunner:
             limit=limit,
         )
 
+    def _collection_version(self, collection: str) -> tuple[Any, ...]:
+        """Identify the current contents of a collection.
+
+        Collections get a new id each time they are recreated, and the row
+        count changes when rows are inserted into an existing one.
+        """
+        name = self._collection_name(collection)
+        description = self.client.describe_collection(name)
+        return (
+            description["collection_id"],
+            description.get("created_timestamp"),
+            int(self.client.get_collection_stats(name)["row_count"]),
+        )
+
+    def _query_iter(
+        self,
+        collection: str,
+        filter_expr: str,
+        output_fields: list[str],
+        batch_size: int = QUERY_BATCH_SIZE,
+    ) -> Iterator[list[dict]]:
+        """Stream the rows matching a query in batches.
+
+        Batches come from a server-side query iterator, the next ones are fetched
+        in a background thread while the current one is consumed. The thread
+        stops and closes the iterator when the consumer stops early.
+        """
+        iterator = self.client.query_iterator(
+            collection_name=self._collection_name(collection),
+            batch_size=batch_size,
+            filter=filter_expr,
+            output_fields=output_fields,
+        )
+        batches: Queue = Queue(maxsize=PREFETCH_BATCHES)
+        stopped = threading.Event()
+
+        def put(item: Any) -> None:
+            while not stopped.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return
+                except Full:
+                    continue
+
+        def fetch() -> None:
+            try:
+                while not stopped.is_set():
+                    batch = iterator.next()
+                    put(batch)
+                    if not batch:
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                iterator.close()
+
+        threading.Thread(target=fetch, daemon=True).start()
+        try:
+            while True:
+                batch = batches.get()
+                if isinstance(batch, Exception):
+                    raise batch
+                if not batch:
+                    return
+                yield batch
+        finally:
+            stopped.set()
+
+    def _query_frame(self, collection: str, filter_expr: str, output_fields: list[str]) -> DataFrame:
+        """Fetch all rows matching a query into a DataFrame, one column at a time."""
+        columns: dict[str, list[Any]] = {field: [] for field in output_fields}
+        for batch in self._query_iter(collection, filter_expr, output_fields):
+            for field, values in columns.items():
+                values.extend(row[field] for row in batch)
+        return pd.DataFrame(columns)
+
 
 def _get_runner(data_paths: dict[str, str]) -> MilvusQueryRunner:
     """Get a connected Milvus query runner.
@@ -82,7 +217,6 @@ def _get_runner(data_paths: dict[str, str]) -> MilvusQueryRunner:
     but we keep the signature for consistency with other query implementations.
     """
     # Get Milvus connection info from environment or use defaults
-    import os
     uri = os.environ.get("MILVUS_URI", "http://localhost:19530")
     prefix = os.environ.get("MILVUS_PREFIX", COLLECTION_PREFIX)
 
@@ -91,6 +225,328 @@ def _get_runner(data_paths: dict[str, str]) -> MilvusQueryRunner:
     return runner
 
 
+class PolygonRings(NamedTuple):
+    """Coordinates of the rings of polygonal geometries in CSR layout.
+
+    The rings of geometry i are ring_offsets[i]:ring_offsets[i + 1], and the
+    closed coordinate sequence of ring r is xs/ys[coord_offsets[r]:coord_offsets[r + 1]].
+    """
+
+    ring_offsets: np.ndarray
+    coord_offsets: np.ndarray
+    xs: np.ndarray
+    ys: np.ndarray
+
+
+class GeometryTable(NamedTuple):
+    """Rows of a zone or building collection with their parsed geometries."""
+
+    keys: np.ndarray
+    names: np.ndarray
+    geoms: np.ndarray
+    tree: shapely.STRtree
+    rings: PolygonRings | None = None
+    bounds: np.ndarray | None = None
+    is_box: np.ndarray | None = None
+
+
+def _polygon_rings(geoms: np.ndarray) -> PolygonRings:
+    """Flatten the exterior and interior rings of (multi)polygons into PolygonRings."""
+    parts, part_geom = shapely.get_parts(geoms, return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+    ring_geom = part_geom[ring_part]
+    return PolygonRings(
+        np.searchsorted(ring_geom, np.arange(len(geoms) + 1)),
+        np.searchsorted(coord_ring, np.arange(len(rings) + 1)),
+        np.ascontiguousarray(coords[:, 0]),
+        np.ascontiguousarray(coords[:, 1]),
+    )
+
+
+def _geometry_table(df: DataFrame, fields: list[str]) -> GeometryTable:
+    """Parse and index the geometries of rows with key, name and geometry fields."""
+    key_field, name_field, geometry_field = fields
+    geoms = shapely.from_wkt(df[geometry_field].to_numpy())
+    return GeometryTable(df[key_field].to_numpy(), df[name_field].to_numpy(), geoms, shapely.STRtree(geoms))
+
+
+def _load_geometry_table(uri: str, prefix: str, table: str, fields: list[str]) -> GeometryTable:
+    """Fetch a table's key, name and geometry fields and index the geometries."""
+    runner = MilvusQueryRunner(uri=uri, prefix=prefix)
+    runner.connect()
+    try:
+        df = runner._query_frame(table, "", fields)
+    finally:
+        runner.disconnect()
+    return _geometry_table(df, fields)
+
+
+def _index_zones(zones: GeometryTable) -> GeometryTable:
+    """Add the ring coordinates and envelopes used by _points_in_zones."""
+    return zones._replace(
+        rings=_polygon_rings(zones.geoms),
+        bounds=shapely.bounds(zones.geoms),
+        # Zones equal to their envelope need no exact point-in-polygon test
+        is_box=shapely.equals(zones.geoms, shapely.envelope(zones.geoms)),
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _load_zones(uri: str, prefix: str) -> GeometryTable:
+    """All zones, fetched, parsed and indexed once per process."""
+    return _index_zones(_load_geometry_table(uri, prefix, "zone", ["z_zonekey", "z_name", "z_boundary"]))
+
+
+def _zone_subset(zones: GeometryTable, idx: np.ndarray) -> GeometryTable:
+    """The zones at positions idx, with their own STRtree and rings."""
+    geoms = zones.geoms[idx]
+    return GeometryTable(
+        zones.keys[idx],
+        zones.names[idx],
+        geoms,
+        shapely.STRtree(geoms),
+        _polygon_rings(geoms),
+        zones.bounds[idx],
+        zones.is_box[idx],
+    )
+
+
+def _zones_intersecting(runner: MilvusQueryRunner, lon: np.ndarray, lat: np.ndarray) -> GeometryTable:
+    """Fetch and index only the zones intersecting any of the given points.
+
+    Milvus evaluates GEOM_INTERSECTS against a MULTIPOINT of each chunk of
+    points with its spatial index, the chunks being queried concurrently.
+    """
+    fields = ["z_zonekey", "z_name", "z_boundary"]
+    located = np.isfinite(lon) & np.isfinite(lat)
+    points = shapely.points(lon[located], lat[located])
+
+    def fetch(start: int) -> list[dict]:
+        chunk_wkt = shapely.to_wkt(
+            shapely.multipoints(points[start:start + ZONE_LOOKUP_POINTS]), rounding_precision=-1
+        )
+        return runner._query("zone", f"GEOM_INTERSECTS(z_boundary, '{chunk_wkt}')", fields)
+
+    with ThreadPoolExecutor(max_workers=ZONE_LOOKUP_WORKERS) as pool:
+        rows = [row for batch in pool.map(fetch, range(0, len(points), ZONE_LOOKUP_POINTS)) for row in batch]
+    df = pd.DataFrame(rows, columns=fields).drop_duplicates("z_zonekey")
+    return _index_zones(_geometry_table(df, fields))
+
+
+def _save_trips(df: DataFrame, path: str) -> None:
+    """Save the cached trip columns as .npy files in the directory path."""
+    parent = os.path.dirname(path)
+    tmp = None
+    try:
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent)
+        for field in TRIP_CACHE_FIELDS:
+            np.save(os.path.join(tmp, f"{field}.npy"), df[field].to_numpy(), allow_pickle=False)
+        os.rename(tmp, path)
+    except (OSError, ValueError) as e:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+        warnings.warn(f"Could not save trip cache to {path}: {e}", stacklevel=2)
+
+
+def _load_trips(runner: MilvusQueryRunner, fields: list[str]) -> DataFrame:
+    """Fetch the given columns of every trip.
+
+    When MILVUS_TRIP_CACHE_DIR is set, the first full-scan query fetches all
+    TRIP_CACHE_FIELDS and saves them there, keyed by the collection id,
+    creation time and row count. Later queries, including those run in other
+    processes, memory-map their columns instead of scanning the collection.
+    """
+    cache_dir = os.environ.get("MILVUS_TRIP_CACHE_DIR")
+    if not cache_dir:
+        return runner._query_frame("trip", "", fields)
+
+    key = repr((runner.uri, runner.prefix, TRIP_CACHE_FIELDS, runner._collection_version("trip")))
+    path = os.path.join(cache_dir, f"trips-{hashlib.sha256(key.encode()).hexdigest()[:16]}")
+    if not os.path.isdir(path):
+        df = runner._query_frame("trip", "", list(TRIP_CACHE_FIELDS))
+        _save_trips(df, path)
+        return df[fields]
+    return pd.DataFrame(
+        {field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r") for field in fields},
+        copy=False,
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _load_buildings(uri: str, prefix: str) -> GeometryTable:
+    """All buildings, fetched, parsed and indexed once per process."""
+    return _load_geometry_table(uri, prefix, "building", ["b_buildingkey", "b_name", "b_boundary"])
+
+
+if nb is not None:
+    @nb.njit(parallel=True, cache=True)
+    def _contains_xy_jit(geom_idx, px, py, ring_offsets, coord_offsets, xs, ys, out):
+        # Even-odd ray casting over all rings of each candidate geometry.
+        # Points on a ring are not contained, like GEOS contains.
+        for k in nb.prange(len(geom_idx)):
+            x = px[k]
+            y = py[k]
+            g = geom_idx[k]
+            inside = False
+            on_boundary = False
+            for r in range(ring_offsets[g], ring_offsets[g + 1]):
+                for i in range(coord_offsets[r], coord_offsets[r + 1] - 1):
+                    x1 = xs[i]
+                    y1 = ys[i]
+                    x2 = xs[i + 1]
+                    y2 = ys[i + 1]
+                    if (
+                        min(x1, x2) <= x <= max(x1, x2)
+                        and min(y1, y2) <= y <= max(y1, y2)
+                        and (x2 - x1) * (y - y1) == (y2 - y1) * (x - x1)
+                    ):
+                        on_boundary = True
+                    elif (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                        inside = not inside
+            out[k] = inside and not on_boundary
+
+    @nb.njit(nogil=True, cache=True)
+    def _group_sums_jit(codes, values, sums, counts):
+        # Sum and count the non-NaN values of each group, all columns of a
+        # row together in a single pass
+        for i in range(len(codes)):
+            g = codes[i]
+            for c in range(len(values)):
+                v = values[c][i]
+                if not np.isnan(v):
+                    sums[c, g] += v
+                    counts[c, g] += 1
+
+
+def _points_in_zones(zones: GeometryTable, lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Find the (point, zone) index pairs of the points inside each zone.
+
+    Candidate pairs come from the zone STRtree and must lie strictly inside the
+    zone envelope, which is exact for rectangular zones. The other candidates
+    are refined with a numba point-in-polygon kernel over the zone rings, or
+    with shapely.contains_xy when numba is not installed.
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    point_idx, zone_idx = zones.tree.query(shapely.points(lon, lat))
+    px = lon[point_idx]
+    py = lat[point_idx]
+    minx, miny, maxx, maxy = zones.bounds[zone_idx].T
+    inside = (px > minx) & (px < maxx) & (py > miny) & (py < maxy)
+    point_idx, zone_idx, px, py = point_idx[inside], zone_idx[inside], px[inside], py[inside]
+
+    exact = ~zones.is_box[zone_idx]
+    inside = np.ones(len(point_idx), dtype=np.bool_)
+    if nb is not None:
+        exact_inside = np.empty(np.count_nonzero(exact), dtype=np.bool_)
+        _contains_xy_jit(zone_idx[exact], px[exact], py[exact], *zones.rings, exact_inside)
+        inside[exact] = exact_inside
+    else:
+        inside[exact] = shapely.contains_xy(zones.geoms[zone_idx[exact]], px[exact], py[exact])
+    return point_idx[inside], zone_idx[inside]
+
+
+def _group_sums(
+    codes: np.ndarray, values: tuple[np.ndarray, ...], n_groups: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sum and count of the non-NaN values of each group, one row per column of values."""
+    sums = np.zeros((len(values), n_groups))
+    counts = np.zeros((len(values), n_groups), dtype=np.int64)
+    if nb is not None:
+        _group_sums_jit(codes, values, sums, counts)
+        return sums, counts
+
+    for c, column in enumerate(values):
+        valid = ~np.isnan(column)
+        sums[c] = np.bincount(codes[valid], weights=column[valid], minlength=n_groups)
+        counts[c] = np.bincount(codes[valid], minlength=n_groups)
+    return sums, counts
+
+
+def _group_means(codes: np.ndarray, n_groups: int, *columns: Any) -> list[np.ndarray]:
+    """Mean of each column per group, given the group code of every row.
+
+    Missing values are skipped, groups without any value get NaN. When numba
+    is installed, all columns are summed in one pass over the rows, and large
+    inputs are split into contiguous shards of rows that are summed in a
+    thread pool without holding the GIL, the partial sums being added up at
+    the end.
+    """
+    n_shards = 1
+    if nb is not None:
+        n_shards = max(1, min(os.cpu_count() or 1, len(codes) // PARALLEL_SHARD_ROWS))
+    shard_bounds = np.linspace(0, len(codes), n_shards + 1).astype(np.int64)
+
+    values = tuple(np.asarray(column, dtype=np.float64) for column in columns)
+    with ThreadPoolExecutor(max_workers=n_shards) as pool:
+        partials = list(pool.map(
+            lambda lo, hi: _group_sums(codes[lo:hi], tuple(column[lo:hi] for column in values), n_groups),
+            shard_bounds[:-1],
+            shard_bounds[1:],
+        ))
+    sums = np.sum([partial[0] for partial in partials], axis=0)
+    counts = np.sum([partial[1] for partial in partials], axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return list(sums / counts)
+
+
+def _supports_order_by(client: MilvusClient) -> bool:
+    """Whether the Milvus server applies order_by_fields to queries."""
+    try:
+        version = client.get_server_version()
+    except MilvusException:
+        return False
+    match = re.match(r"v?(\d+)\.(\d+)", str(version))
+    return match is not None and tuple(map(int, match.groups())) >= ORDER_BY_MIN_SERVER_VERSION
+
+
+def _top_trips_by_tip(runner: MilvusQueryRunner, output_fields: list[str], n: int) -> DataFrame:
+    """Fetch the n trips with the highest tips, ties broken by trip key.
+
+    The ordering is pushed down to Milvus when the server version supports
+    ordered queries. Otherwise only the tip column is scanned to find the n-th
+    highest tip, and the trips at or above it are fetched and sorted client-side.
+    """
+    sort_columns = ["t_tip", "t_tripkey"]
+    if not _supports_order_by(runner.client):
+        return _top_trips_by_threshold(runner, output_fields, n)
+    try:
+        top_trips = pd.DataFrame(
+            runner.client.query(
+                collection_name=runner._collection_name("trip"),
+                filter="",
+                output_fields=output_fields,
+                limit=n,
+                order_by_fields=[
+                    {"field": "t_tip", "order": "desc"},
+                    {"field": "t_tripkey", "order": "asc"},
+                ],
+            ),
+            columns=output_fields,
+        )
+        # Guard against a server that still ignored the ordering
+        ordered = top_trips.sort_values(sort_columns, ascending=[False, True], kind="stable")
+        if ordered.index.equals(top_trips.index):
+            return top_trips
+    except MilvusException:
+        pass
+    return _top_trips_by_threshold(runner, output_fields, n)
+
+
+def _top_trips_by_threshold(runner: MilvusQueryRunner, output_fields: list[str], n: int) -> DataFrame:
+    """Fetch the n trips with the highest tips, ties broken by trip key, without server-side ordering."""
+    sort_columns = ["t_tip", "t_tripkey"]
+    tips = runner._query_frame("trip", "", ["t_tip"])["t_tip"].dropna().to_numpy()
+    if len(tips) > n:
+        threshold = np.partition(tips, len(tips) - n)[len(tips) - n]
+        trip_df = runner._query_frame("trip", f"t_tip >= {float(threshold)!r}", output_fields)
+    else:
+        trip_df = runner._query_frame("trip", "", output_fields)
+    return trip_df.sort_values(sort_columns, ascending=[False, True]).head(n)
+
+
 def q1(data_paths: dict[str, str]) -> DataFrame:
     """Q1 (Milvus): Trips starting within 50km of Sedona city center.
 
@@ -99,38 +555,36 @@ def q1(data_paths: dict[str, str]) -> DataFrame:
     runner = _get_runner(data_paths)
     try:
         # Sedona city center coordinates and radius (0.45 degrees ~ 50km)
-        center_wkt = "POINT(-111.7610 34.8697)"
+        center_lon, center_lat = -111.7610, 34.8697
+        center_wkt = f"POINT({center_lon} {center_lat})"
         radius = 0.45
 
         # Query using Milvus GIS filter
         filter_expr = f"GEOM_DWITHIN(t_pickuploc, '{center_wkt}', {radius})"
-        results = runner._query(
+        df = runner._query_frame(
             "trip",
             filter_expr,
-            ["t_tripkey", "t_pickuploc", "t_pickuptime"],
-            limit=1000000,
+            ["t_tripkey", "t_pickup_lon", "t_pickup_lat", "t_pickuptime"],
         )
 
-        if not results:
+        if df.empty:
             return pd.DataFrame(columns=["t_tripkey", "pickup_lon", "pickup_lat", "t_pickuptime", "distance_to_center"])
 
-        # Convert to DataFrame and compute distances
-        df = pd.DataFrame(results)
-        center = Point(-111.7610, 34.8697)
-
-        # Parse WKT geometry and extract coordinates
-        from shapely import wkt as shapely_wkt
-        df["pickup_geom"] = df["t_pickuploc"].apply(shapely_wkt.loads)
-        df["pickup_lon"] = df["pickup_geom"].apply(lambda g: g.x)
-        df["pickup_lat"] = df["pickup_geom"].apply(lambda g: g.y)
-        df["distance_to_center"] = df["pickup_geom"].apply(lambda g: g.distance(center))
-
-        # Sort and select columns
-        result = df.sort_values(
-            ["distance_to_center", "t_tripkey"], ascending=[True, True]
-        )[["t_tripkey", "pickup_lon", "pickup_lat", "t_pickuptime", "distance_to_center"]].reset_index(drop=True)
-
-        return result
+        # Compute distances from the stored coordinates in one vectorized pass
+        tripkey = df["t_tripkey"].to_numpy()
+        lon = df["t_pickup_lon"].to_numpy(dtype=np.float64)
+        lat = df["t_pickup_lat"].to_numpy(dtype=np.float64)
+        distance = np.hypot(lon - center_lon, lat - center_lat)
+
+        # Sort by distance, then trip key, on the raw arrays
+        order = np.lexsort((tripkey, distance))
+        return pd.DataFrame({
+            "t_tripkey": tripkey[order],
+            "pickup_lon": lon[order],
+            "pickup_lat": lat[order],
+            "t_pickuptime": pd.to_datetime(df["t_pickuptime"].to_numpy()[order], unit="ms"),
+            "distance_to_center": distance[order],
+        })
     finally:
         runner.disconnect()
 
@@ -157,14 +611,7 @@ def q2(data_paths: dict[str, str]) -> DataFrame:
 
         # Count trips intersecting the county
         filter_expr = f"GEOM_INTERSECTS(t_pickuploc, '{county_wkt}')"
-        results = runner._query(
-            "trip",
-            filter_expr,
-            ["t_tripkey"],
-            limit=10000000,
-        )
-
-        count = len(results)
+        count = sum(len(batch) for batch in runner._query_iter("trip", filter_expr, ["t_tripkey"]))
         return pd.DataFrame({"trip_count_in_coconino_county": [count]})
     finally:
         runner.disconnect()
@@ -182,41 +629,49 @@ def q3(data_paths: dict[str, str]) -> DataFrame:
         buffer_distance = 0.045  # ~5km
 
         filter_expr = f"GEOM_DWITHIN(t_pickuploc, '{box_wkt}', {buffer_distance})"
-        results = runner._query(
+        df = runner._query_frame(
             "trip",
             filter_expr,
             ["t_tripkey", "t_pickuptime", "t_dropofftime", "t_distance", "t_fare"],
-            limit=10000000,
         )
 
-        if not results:
+        if df.empty:
             return pd.DataFrame(columns=["pickup_month", "total_trips", "avg_distance", "avg_duration", "avg_fare"])
 
-        df = pd.DataFrame(results)
-
-        # Convert timestamps
-        df["t_pickuptime"] = pd.to_datetime(df["t_pickuptime"])
-        df["t_dropofftime"] = pd.to_datetime(df["t_dropofftime"])
+        # Timestamps are stored as epoch milliseconds, missing ones become NaN
+        pickup = df["t_pickuptime"].to_numpy(dtype=np.float64)
+        dropoff = df["t_dropofftime"].to_numpy(dtype=np.float64)
 
         # Compute duration in seconds
-        df["_duration_seconds"] = (df["t_dropofftime"] - df["t_pickuptime"]).dt.total_seconds()
-
-        # Group by month
-        df["pickup_month"] = df["t_pickuptime"].dt.to_period("M").dt.to_timestamp()
-
-        agg = (
-            df.groupby("pickup_month", as_index=False)
-            .agg(
-                total_trips=("t_tripkey", "count"),
-                avg_distance=("t_distance", "mean"),
-                avg_duration=("_duration_seconds", "mean"),
-                avg_fare=("t_fare", "mean"),
-            )
-            .sort_values("pickup_month")
-            .reset_index(drop=True)
+        durations = (dropoff - pickup) / 1000
+
+        # Group by month, numbering the months from the earliest pickup
+        grouped = ~np.isnan(pickup)
+        if not grouped.any():
+            return pd.DataFrame(columns=["pickup_month", "total_trips", "avg_distance", "avg_duration", "avg_fare"])
+
+        months = pickup[grouped].astype(np.int64).astype("datetime64[ms]").astype("datetime64[M]")
+        first_month = months.min()
+        codes = (months - first_month).astype(np.int64)
+        n_months = int(codes.max()) + 1
+
+        total_trips = np.bincount(codes, minlength=n_months)
+        avg_distance, avg_duration, avg_fare = _group_means(
+            codes,
+            n_months,
+            df["t_distance"].to_numpy()[grouped],
+            durations[grouped],
+            df["t_fare"].to_numpy()[grouped],
         )
 
-        return agg
+        present = total_trips > 0
+        return pd.DataFrame({
+            "pickup_month": (first_month + np.arange(n_months))[present].astype("datetime64[ns]"),
+            "total_trips": total_trips[present],
+            "avg_distance": avg_distance[present],
+            "avg_duration": avg_duration[present],
+            "avg_fare": avg_fare[present],
+        })
     finally:
         runner.disconnect()
 
@@ -224,57 +679,35 @@ def q3(data_paths: dict[str, str]) -> DataFrame:
 def q4(data_paths: dict[str, str]) -> DataFrame:
     """Q4 (Milvus): Zone distribution of top 1000 trips by tip amount.
 
-    Uses ST_Within for spatial join (implemented via client-side processing).
+    Candidate zones are found with ST_Intersects in Milvus, ST_Within is
+    applied client-side.
     """
     runner = _get_runner(data_paths)
     try:
         # Get top 1000 trips by tip
-        trip_results = runner._query(
-            "trip",
-            "",  # No filter, get all and sort client-side
-            ["t_tripkey", "t_pickuploc", "t_tip"],
-            limit=10000000,
-        )
+        top_trips = _top_trips_by_tip(runner, ["t_tripkey", "t_pickup_lon", "t_pickup_lat", "t_tip"], 1000)
 
-        if not trip_results:
+        if top_trips.empty:
             return pd.DataFrame(columns=["z_zonekey", "z_name", "trip_count"])
 
-        trip_df = pd.DataFrame(trip_results)
-        top_trips = trip_df.sort_values(
-            ["t_tip", "t_tripkey"], ascending=[False, True]
-        ).head(1000)
+        lon = top_trips["t_pickup_lon"].to_numpy(dtype=np.float64)
+        lat = top_trips["t_pickup_lat"].to_numpy(dtype=np.float64)
 
-        # Get all zones
-        zone_results = runner._query(
-            "zone",
-            "",
-            ["z_zonekey", "z_name", "z_boundary"],
-            limit=100000,
-        )
+        # Get the zones intersecting a pickup
+        zones = _zones_intersecting(runner, lon, lat)
 
-        if not zone_results:
+        if len(zones.keys) == 0:
             return pd.DataFrame(columns=["z_zonekey", "z_name", "trip_count"])
 
-        zone_df = pd.DataFrame(zone_results)
-
-        # Parse geometries
-        from shapely import wkt as shapely_wkt
-        top_trips["pickup_geom"] = top_trips["t_pickuploc"].apply(shapely_wkt.loads)
-        zone_df["zone_geom"] = zone_df["z_boundary"].apply(shapely_wkt.loads)
-
         # Perform spatial join (point within polygon)
-        results = []
-        for _, zone_row in zone_df.iterrows():
-            zone_geom = zone_row["zone_geom"]
-            count = sum(1 for pt in top_trips["pickup_geom"] if zone_geom.contains(pt))
-            if count > 0:
-                results.append({
-                    "z_zonekey": zone_row["z_zonekey"],
-                    "z_name": zone_row["z_name"],
-                    "trip_count": count,
-                })
-
-        result_df = pd.DataFrame(results)
+        _, zone_idx = _points_in_zones(zones, lon, lat)
+        zone_df = pd.DataFrame({
+            "z_zonekey": zones.keys,
+            "z_name": zones.names,
+            "trip_count": np.bincount(zone_idx, minlength=len(zones.keys)),
+        })
+
+        result_df = zone_df.loc[zone_df["trip_count"] > 0, ["z_zonekey", "z_name", "trip_count"]]
         if result_df.empty:
             return pd.DataFrame(columns=["z_zonekey", "z_name", "trip_count"])
 
@@ -307,64 +740,38 @@ def q6(data_paths: dict[str, str]) -> DataFrame:
         bbox_wkt = "POLYGON((-112.2110 34.4197, -111.3110 34.4197, -111.3110 35.3197, -112.2110 35.3197, -112.2110 34.4197))"
 
         # Get zones intersecting the bounding box
-        filter_expr = f"GEOM_INTERSECTS(z_boundary, '{bbox_wkt}')"
-        zone_results = runner._query(
-            "zone",
-            filter_expr,
-            ["z_zonekey", "z_name", "z_boundary"],
-            limit=100000,
-        )
+        zones = _load_zones(runner.uri, runner.prefix)
+        in_bbox = np.flatnonzero(shapely.intersects(zones.geoms, shapely.from_wkt(bbox_wkt)))
 
-        if not zone_results:
+        if len(in_bbox) == 0:
             return pd.DataFrame(columns=["z_zonekey", "z_name", "total_pickups", "avg_distance", "avg_duration"])
 
-        zone_df = pd.DataFrame(zone_results)
-
         # Get all trips
-        trip_results = runner._query(
-            "trip",
-            "",
-            ["t_tripkey", "t_pickuploc", "t_pickuptime", "t_dropofftime", "t_totalamount", "t_distance"],
-            limit=10000000,
-        )
+        trip_df = _load_trips(runner, ["t_pickup_lon", "t_pickup_lat", "t_pickuptime", "t_dropofftime", "t_totalamount"])
 
-        if not trip_results:
+        if trip_df.empty:
             return pd.DataFrame(columns=["z_zonekey", "z_name", "total_pickups", "avg_distance", "avg_duration"])
 
-        trip_df = pd.DataFrame(trip_results)
-
-        # Parse geometries
-        from shapely import wkt as shapely_wkt
-        trip_df["pickup_geom"] = trip_df["t_pickuploc"].apply(shapely_wkt.loads)
-        zone_df["zone_geom"] = zone_df["z_boundary"].apply(shapely_wkt.loads)
-
-        # Convert timestamps
-        trip_df["t_pickuptime"] = pd.to_datetime(trip_df["t_pickuptime"])
-        trip_df["t_dropofftime"] = pd.to_datetime(trip_df["t_dropofftime"])
-
-        # Perform spatial join and aggregate
-        results = []
-        for _, zone_row in zone_df.iterrows():
-            zone_geom = zone_row["zone_geom"]
-            mask = trip_df["pickup_geom"].apply(lambda pt: zone_geom.contains(pt))
-            matching_trips = trip_df[mask]
-
-            if len(matching_trips) > 0:
-                # Determine distance column
-                dist_col = "t_totalamount" if "t_totalamount" in matching_trips.columns else "t_distance"
-                avg_dist = matching_trips[dist_col].mean() if dist_col in matching_trips.columns else np.nan
-
-                durations = (matching_trips["t_dropofftime"] - matching_trips["t_pickuptime"]).dt.total_seconds()
-
-                results.append({
-                    "z_zonekey": zone_row["z_zonekey"],
-                    "z_name": zone_row["z_name"],
-                    "total_pickups": len(matching_trips),
-                    "avg_distance": avg_dist,
-                    "avg_duration": durations.mean(),
-                })
-
-        result_df = pd.DataFrame(results)
+        # Timestamps are stored as epoch milliseconds
+        durations = (
+            trip_df["t_dropofftime"].to_numpy(dtype=np.float64)
+            - trip_df["t_pickuptime"].to_numpy(dtype=np.float64)
+        ) / 1000
+
+        # Perform spatial join (point within polygon) against the zones in the bounding box only
+        zones = _zone_subset(zones, in_bbox)
+        trip_idx, zone_idx = _points_in_zones(zones, trip_df["t_pickup_lon"], trip_df["t_pickup_lat"])
+
+        # Aggregate per zone, the total amount is reported as avg_distance
+        result_df = pd.DataFrame({"z_zonekey": zones.keys, "z_name": zones.names})
+        result_df["total_pickups"] = np.bincount(zone_idx, minlength=len(zones.keys))
+        result_df["avg_distance"], result_df["avg_duration"] = _group_means(
+            zone_idx,
+            len(zones.keys),
+            trip_df["t_totalamount"].to_numpy()[trip_idx],
+            durations[trip_idx],
+        )
+        result_df = result_df[result_df["total_pickups"] > 0]
         if result_df.empty:
             return pd.DataFrame(columns=["z_zonekey", "z_name", "total_pickups", "avg_distance", "avg_duration"])
 
@@ -394,55 +801,42 @@ def q8(data_paths: dict[str, str]) -> DataFrame:
     runner = _get_runner(data_paths)
     try:
         # Get all buildings
-        building_results = runner._query(
-            "building",
-            "",
-            ["b_buildingkey", "b_name", "b_boundary"],
-            limit=1000000,
-        )
+        buildings = _load_buildings(runner.uri, runner.prefix)
 
-        if not building_results:
+        if len(buildings.keys) == 0:
             return pd.DataFrame(columns=["b_buildingkey", "b_name", "nearby_pickup_count"])
 
-        building_df = pd.DataFrame(building_results)
-
         # Get all trips
-        trip_results = runner._query(
-            "trip",
-            "",
-            ["t_tripkey", "t_pickuploc"],
-            limit=10000000,
-        )
+        trip_df = _load_trips(runner, ["t_pickup_lon", "t_pickup_lat"])
 
-        if not trip_results:
+        if trip_df.empty:
             return pd.DataFrame(columns=["b_buildingkey", "b_name", "nearby_pickup_count"])
 
-        trip_df = pd.DataFrame(trip_results)
-
-        # Parse geometries
-        from shapely import wkt as shapely_wkt
-        trip_df["pickup_geom"] = trip_df["t_pickuploc"].apply(shapely_wkt.loads)
-        building_df["boundary_geom"] = building_df["b_boundary"].apply(shapely_wkt.loads)
+        pickup_points = shapely.points(trip_df["t_pickup_lon"], trip_df["t_pickup_lat"])
+        building_geoms = buildings.geoms
 
         # Distance threshold (~500m in degrees)
         threshold = 0.0045
 
-        # Count nearby pickups for each building
-        results = []
-        for _, building_row in building_df.iterrows():
-            boundary_geom = building_row["boundary_geom"]
-            count = sum(
-                1 for pt in trip_df["pickup_geom"]
-                if pt.distance(boundary_geom) <= threshold
-            )
-            if count > 0:
-                results.append({
-                    "b_buildingkey": building_row["b_buildingkey"],
-                    "b_name": building_row["b_name"],
-                    "nearby_pickup_count": count,
-                })
+        # Candidate pickups fall inside the building envelope expanded by the threshold
+        tree = shapely.STRtree(pickup_points)
+        bounds = shapely.bounds(building_geoms)
+        search_boxes = shapely.box(
+            bounds[:, 0] - threshold, bounds[:, 1] - threshold,
+            bounds[:, 2] + threshold, bounds[:, 3] + threshold,
+        )
+        building_idx, trip_idx = tree.query(search_boxes, predicate="intersects")
 
-        result_df = pd.DataFrame(results)
+        # Count nearby pickups for each building
+        nearby = shapely.distance(pickup_points[trip_idx], building_geoms[building_idx]) <= threshold
+        building_df = pd.DataFrame({
+            "b_buildingkey": buildings.keys,
+            "b_name": buildings.names,
+            "nearby_pickup_count": np.bincount(building_idx[nearby], minlength=len(buildings.keys)),
+        })
+        result_df = building_df.loc[
+            building_df["nearby_pickup_count"] > 0, ["b_buildingkey", "b_name", "nearby_pickup_count"]
+        ]
         if result_df.empty:
             return pd.DataFrame(columns=["b_buildingkey", "b_name", "nearby_pickup_count"])
 
@@ -462,56 +856,38 @@ def q9(data_paths: dict[str, str]) -> DataFrame:
     runner = _get_runner(data_paths)
     try:
         # Get all buildings
-        building_results = runner._query(
-            "building",
-            "",
-            ["b_buildingkey", "b_boundary"],
-            limit=1000000,
-        )
+        buildings = _load_buildings(runner.uri, runner.prefix)
 
-        if not building_results:
+        if len(buildings.keys) == 0:
             return pd.DataFrame(columns=["building_1", "building_2", "area1", "area2", "overlap_area", "iou"])
 
-        building_df = pd.DataFrame(building_results)
-
-        # Parse geometries
-        from shapely import wkt as shapely_wkt
-        building_df["boundary_geom"] = building_df["b_boundary"].apply(shapely_wkt.loads)
-
-        # Find intersecting pairs and compute IoU
-        results = []
-        buildings = building_df.to_dict("records")
-        n = len(buildings)
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                b1 = buildings[i]
-                b2 = buildings[j]
-                geom1 = b1["boundary_geom"]
-                geom2 = b2["boundary_geom"]
-
-                if geom1.intersects(geom2):
-                    area1 = geom1.area
-                    area2 = geom2.area
-                    intersection = geom1.intersection(geom2)
-                    overlap_area = intersection.area
-                    union_area = area1 + area2 - overlap_area
-
-                    if union_area > 0:
-                        iou = overlap_area / union_area
-                    elif overlap_area > 0:
-                        iou = 1.0
-                    else:
-                        iou = 0.0
-
-                    results.append({
-                        "building_1": b1["b_buildingkey"],
-                        "building_2": b2["b_buildingkey"],
-                        "area1": area1,
-                        "area2": area2,
-                        "overlap_area": overlap_area,
-                        "iou": iou,
-                    })
+        # Find intersecting pairs through an STRtree self-join, keeping each pair once
+        geoms = buildings.geoms
+        left, right = buildings.tree.query(geoms, predicate="intersects")
+        keep = left < right
+        left, right = left[keep], right[keep]
+
+        # Compute IoU for the intersecting pairs
+        area1 = shapely.area(geoms[left])
+        area2 = shapely.area(geoms[right])
+        overlap_area = shapely.area(shapely.intersection(geoms[left], geoms[right]))
+        union_area = area1 + area2 - overlap_area
+        with np.errstate(divide="ignore", invalid="ignore"):
+            iou = np.where(
+                union_area > 0,
+                overlap_area / union_area,
+                np.where(overlap_area > 0, 1.0, 0.0),
+            )
+
+        keys = buildings.keys
+        results = {
+            "building_1": keys[left],
+            "building_2": keys[right],
+            "area1": area1,
+            "area2": area2,
+            "overlap_area": overlap_area,
+            "iou": iou,
+        }
 
         result_df = pd.DataFrame(results)
         if result_df.empty:
@@ -532,72 +908,42 @@ def q10(data_paths: dict[str, str]) -> DataFrame:
     runner = _get_runner(data_paths)
     try:
         # Get all zones
-        zone_results = runner._query(
-            "zone",
-            "",
-            ["z_zonekey", "z_name", "z_boundary"],
-            limit=1000000,
-        )
+        zones = _load_zones(runner.uri, runner.prefix)
 
-        if not zone_results:
+        if len(zones.keys) == 0:
             return pd.DataFrame(columns=["z_zonekey", "pickup_zone", "avg_duration", "avg_distance", "num_trips"])
 
-        zone_df = pd.DataFrame(zone_results)
+        result_df = pd.DataFrame({"z_zonekey": zones.keys, "pickup_zone": zones.names})
 
         # Get all trips
-        trip_results = runner._query(
-            "trip",
-            "",
-            ["t_tripkey", "t_pickuploc", "t_pickuptime", "t_dropofftime", "t_distance"],
-            limit=10000000,
-        )
-
-        # Parse geometries
-        from shapely import wkt as shapely_wkt
-        zone_df["zone_geom"] = zone_df["z_boundary"].apply(shapely_wkt.loads)
+        trip_df = _load_trips(runner, ["t_pickup_lon", "t_pickup_lat", "t_pickuptime", "t_dropofftime", "t_distance"])
 
-        if not trip_results:
+        if trip_df.empty:
             # Return all zones with 0 trips
-            result = zone_df[["z_zonekey", "z_name"]].copy()
-            result["pickup_zone"] = result["z_name"]
-            result["avg_duration"] = np.nan
-            result["avg_distance"] = np.nan
-            result["num_trips"] = 0
-            return result[["z_zonekey", "pickup_zone", "avg_duration", "avg_distance", "num_trips"]].sort_values(
+            result_df["avg_duration"] = np.nan
+            result_df["avg_distance"] = np.nan
+            result_df["num_trips"] = 0
+            return result_df.sort_values(
                 ["avg_duration", "z_zonekey"], ascending=[False, True], na_position="last"
             ).reset_index(drop=True)
 
-        trip_df = pd.DataFrame(trip_results)
-        trip_df["pickup_geom"] = trip_df["t_pickuploc"].apply(shapely_wkt.loads)
-        trip_df["t_pickuptime"] = pd.to_datetime(trip_df["t_pickuptime"])
-        trip_df["t_dropofftime"] = pd.to_datetime(trip_df["t_dropofftime"])
-
-        # Compute stats for each zone
-        results = []
-        for _, zone_row in zone_df.iterrows():
-            zone_geom = zone_row["zone_geom"]
-            mask = trip_df["pickup_geom"].apply(lambda pt: zone_geom.contains(pt))
-            matching_trips = trip_df[mask]
-
-            if len(matching_trips) > 0:
-                durations = (matching_trips["t_dropofftime"] - matching_trips["t_pickuptime"]).dt.total_seconds()
-                results.append({
-                    "z_zonekey": zone_row["z_zonekey"],
-                    "pickup_zone": zone_row["z_name"],
-                    "avg_duration": durations.mean(),
-                    "avg_distance": matching_trips["t_distance"].mean(),
-                    "num_trips": len(matching_trips),
-                })
-            else:
-                results.append({
-                    "z_zonekey": zone_row["z_zonekey"],
-                    "pickup_zone": zone_row["z_name"],
-                    "avg_duration": np.nan,
-                    "avg_distance": np.nan,
-                    "num_trips": 0,
-                })
+        durations = (
+            trip_df["t_dropofftime"].to_numpy(dtype=np.float64)
+            - trip_df["t_pickuptime"].to_numpy(dtype=np.float64)
+        ) / 1000
+
+        # Perform spatial join (point within polygon)
+        trip_idx, zone_idx = _points_in_zones(zones, trip_df["t_pickup_lon"], trip_df["t_pickup_lat"])
+
+        # Compute stats for each zone, zones without trips are kept
+        result_df["avg_duration"], result_df["avg_distance"] = _group_means(
+            zone_idx,
+            len(zones.keys),
+            durations[trip_idx],
+            trip_df["t_distance"].to_numpy()[trip_idx],
+        )
+        result_df["num_trips"] = np.bincount(zone_idx, minlength=len(zones.keys))
 
-        result_df = pd.DataFrame(results)
         return result_df.sort_values(
             ["avg_duration", "z_zonekey"], ascending=[False, True], na_position="last"
         ).reset_index(drop=True)
@@ -613,57 +959,34 @@ def q11(data_paths: dict[str, str]) -> DataFrame:
     runner = _get_runner(data_paths)
     try:
         # Get all zones
-        zone_results = runner._query(
-            "zone",
-            "",
-            ["z_zonekey", "z_boundary"],
-            limit=1000000,
-        )
+        zones = _load_zones(runner.uri, runner.prefix)
 
-        if not zone_results:
+        if len(zones.keys) == 0:
             return pd.DataFrame({"cross_zone_trip_count": [0]})
 
-        zone_df = pd.DataFrame(zone_results)
-
         # Get all trips
-        trip_results = runner._query(
-            "trip",
-            "",
-            ["t_tripkey", "t_pickuploc", "t_dropoffloc"],
-            limit=10000000,
-        )
+        trip_df = _load_trips(runner, ["t_pickup_lon", "t_pickup_lat", "t_dropoff_lon", "t_dropoff_lat"])
 
-        if not trip_results:
+        if trip_df.empty:
             return pd.DataFrame({"cross_zone_trip_count": [0]})
 
-        trip_df = pd.DataFrame(trip_results)
-
-        # Parse geometries
-        from shapely import wkt as shapely_wkt
-        trip_df["pickup_geom"] = trip_df["t_pickuploc"].apply(shapely_wkt.loads)
-        trip_df["dropoff_geom"] = trip_df["t_dropoffloc"].apply(shapely_wkt.loads)
-        zone_df["zone_geom"] = zone_df["z_boundary"].apply(shapely_wkt.loads)
+        # Trailing -1 is the key of points outside every zone
+        zone_keys = np.append(zones.keys, -1)
 
-        # Build spatial index for zones
-        zones = zone_df.to_dict("records")
-
-        def find_zone(point):
-            """Find zone containing the point."""
-            for zone in zones:
-                if zone["zone_geom"].contains(point):
-                    return zone["z_zonekey"]
-            return None
+        def find_zones(lon, lat):
+            """Find the zone key containing each point, or -1 when there is none."""
+            point_idx, zone_idx = _points_in_zones(zones, lon, lat)
+            # A point inside several zones belongs to the first one
+            first_zone = np.full(len(lon), len(zones.keys))
+            np.minimum.at(first_zone, point_idx, zone_idx)
+            return zone_keys[first_zone]
 
         # Find pickup and dropoff zones for each trip
-        trip_df["pickup_zone"] = trip_df["pickup_geom"].apply(find_zone)
-        trip_df["dropoff_zone"] = trip_df["dropoff_geom"].apply(find_zone)
+        pickup_zone = find_zones(trip_df["t_pickup_lon"], trip_df["t_pickup_lat"])
+        dropoff_zone = find_zones(trip_df["t_dropoff_lon"], trip_df["t_dropoff_lat"])
 
         # Count cross-zone trips
-        mask = (
-            trip_df["pickup_zone"].notna() &
-            trip_df["dropoff_zone"].notna() &
-            (trip_df["pickup_zone"] != trip_df["dropoff_zone"])
-        )
+        mask = (pickup_zone != -1) & (dropoff_zone != -1) & (pickup_zone != dropoff_zone)
         count = int(mask.sum())
 
         return pd.DataFrame({"cross_zone_trip_count": [count]})